@@ -1,8 +1,11 @@
 import os
-from sqlalchemy import create_engine, Column, Integer, String, ForeignKey, Text
+from datetime import datetime, timezone
+from sqlalchemy import (create_engine, Column, Integer, String, ForeignKey, Text, Float, DateTime, Boolean,
+                        Index, insert, update, false)
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.exc import SQLAlchemyError, IntegrityError
+from ladder import EloLadder
 
 # Get database URL from environment
 DATABASE_URL = os.getenv('DATABASE_URL')
@@ -50,6 +53,40 @@ class Move(Base):
     pokemon_id = Column(Integer, ForeignKey("pokemon.id"))
     pokemon = relationship("Pokemon", back_populates="moves")
 
+class BattleResult(Base):
+    __tablename__ = "battle_results"
+
+    id = Column(Integer, primary_key=True, index=True)
+    player_team_id = Column(Integer, ForeignKey("teams.id"), nullable=False, index=True)
+    opponent_team_id = Column(Integer, ForeignKey("teams.id"), nullable=False, index=True)
+    winner = Column(String, nullable=False)  # "player" or "opponent"
+    turns = Column(Integer)
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    rated = Column(Boolean, nullable=False, default=False, server_default=false())
+
+    __table_args__ = (
+        # Only unrated results are ever scanned by update_ratings
+        Index("ix_battle_results_unrated", id,
+              postgresql_where=rated == false(), sqlite_where=rated == false()),
+    )
+
+class TeamRating(Base):
+    __tablename__ = "team_ratings"
+
+    team_id = Column(Integer, ForeignKey("teams.id"), primary_key=True)
+    rating = Column(Float, nullable=False)
+    games = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index("ix_team_ratings_rating", rating.desc(), team_id),
+    )
+
+class LadderState(Base):
+    """Single row locked while ratings are updated, so rating passes run one at a time."""
+    __tablename__ = "ladder_state"
+
+    id = Column(Integer, primary_key=True)
+
 # Create all tables
 try:
     Base.metadata.create_all(bind=engine)
@@ -159,3 +196,189 @@ def get_all_teams() -> list:
         raise Exception(f"Database error: {str(e)}")
     finally:
         db.close()
+
+def get_all_team_details() -> dict:
+    """Get every team's Pokemon list and move types, keyed by team name.
+
+    Loads all teams with two queries instead of one per team, for building
+    indexes over the full set of saved teams.
+    """
+    db = SessionLocal()
+    try:
+        result = {}
+        pokemon_owner = {}
+        rows = (
+            db.query(Team.name, Pokemon.id, Pokemon.name)
+            .outerjoin(Pokemon, Pokemon.team_id == Team.id)
+            .order_by(Team.id, Pokemon.id)
+        )
+        for team_name, pokemon_id, pokemon_name in rows:
+            team = result.setdefault(team_name, {'pokemon': [], 'moves': {}})
+            if pokemon_id is not None:
+                team['pokemon'].append(pokemon_name)
+                # Moves are keyed by species; keep the first copy's moves only
+                if pokemon_name not in team['moves']:
+                    team['moves'][pokemon_name] = []
+                    pokemon_owner[pokemon_id] = (team, pokemon_name)
+
+        for pokemon_id, move_type in db.query(Move.pokemon_id, Move.type).order_by(Move.id):
+            if pokemon_id in pokemon_owner:
+                team, pokemon_name = pokemon_owner[pokemon_id]
+                team['moves'][pokemon_name].append({'type': move_type})
+        return result
+    except SQLAlchemyError as e:
+        raise Exception(f"Database error: {str(e)}")
+    finally:
+        db.close()
+
+def save_battle_results(results: list) -> int:
+    """Bulk append battle outcomes.
+
+    Each result is a dict with 'player_team' and 'opponent_team' names, a
+    'winner' as returned by `BattleSimulator.is_battle_over` once the battle
+    is finished ("player" or "opponent") and optional 'turns'.
+    """
+    if not results:
+        return 0
+
+    for r in results:
+        if r.get('winner') not in ('player', 'opponent'):
+            raise ValueError(f"Invalid winner {r.get('winner')!r}, expected 'player' or 'opponent'")
+        if r['player_team'] == r['opponent_team']:
+            raise ValueError(f"Team '{r['player_team']}' cannot battle itself")
+
+    db = SessionLocal()
+    try:
+        names = {r['player_team'] for r in results} | {r['opponent_team'] for r in results}
+        team_ids = dict(db.query(Team.name, Team.id).filter(Team.name.in_(names)).all())
+        missing = names - team_ids.keys()
+        if missing:
+            raise ValueError(f"Unknown team(s): {', '.join(sorted(missing))}")
+
+        now = datetime.now(timezone.utc)
+        rows = [
+            {
+                'player_team_id': team_ids[r['player_team']],
+                'opponent_team_id': team_ids[r['opponent_team']],
+                'winner': r['winner'],
+                'turns': r.get('turns'),
+                'created_at': now,
+                'rated': False
+            }
+            for r in results
+        ]
+        db.execute(insert(BattleResult), rows)
+        db.commit()
+        return len(rows)
+    except SQLAlchemyError as e:
+        db.rollback()
+        raise Exception(f"Database error: {str(e)}")
+    except Exception as e:
+        db.rollback()
+        raise e
+    finally:
+        db.close()
+
+def save_battle_result(player_team: str, opponent_team: str, winner: str, turns: int = None) -> None:
+    """Append a single battle outcome."""
+    save_battle_results([{
+        'player_team': player_team,
+        'opponent_team': opponent_team,
+        'winner': winner,
+        'turns': turns
+    }])
+
+def update_ratings(ladder: EloLadder = None, batch_size: int = 10000) -> int:
+    """Apply battle results that have not been rated yet to the team ratings.
+
+    Only results not yet marked as rated are read, so the cost is proportional
+    to the number of new battles rather than the full history. Each batch is
+    applied and marked as rated in one transaction while the LadderState row
+    is locked, so concurrent calls do not apply the same results twice and a
+    result that commits late is still picked up by the next call.
+    """
+    ladder = ladder or EloLadder()
+    db = SessionLocal()
+    try:
+        if db.get(LadderState, 1) is None:
+            try:
+                db.add(LadderState(id=1))
+                db.commit()
+            except IntegrityError:
+                # Another caller created the row first
+                db.rollback()
+
+        processed = 0
+        while True:
+            db.query(LadderState).filter(LadderState.id == 1).with_for_update().one()
+            batch = (
+                db.query(BattleResult.id, BattleResult.player_team_id,
+                         BattleResult.opponent_team_id, BattleResult.winner)
+                .filter(BattleResult.rated == false())
+                .order_by(BattleResult.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not batch:
+                db.commit()
+                break
+
+            team_ids = {r.player_team_id for r in batch} | {r.opponent_team_id for r in batch}
+            existing = {
+                rating.team_id: rating
+                for rating in db.query(TeamRating).filter(TeamRating.team_id.in_(team_ids))
+            }
+            ratings = {team_id: rating.rating for team_id, rating in existing.items()}
+            games = {team_id: rating.games for team_id, rating in existing.items()}
+
+            for result in batch:
+                ladder.apply_result(ratings, result.player_team_id,
+                                    result.opponent_team_id, result.winner)
+                games[result.player_team_id] = games.get(result.player_team_id, 0) + 1
+                games[result.opponent_team_id] = games.get(result.opponent_team_id, 0) + 1
+
+            for team_id in team_ids:
+                if team_id in existing:
+                    existing[team_id].rating = ratings[team_id]
+                    existing[team_id].games = games[team_id]
+                else:
+                    db.add(TeamRating(team_id=team_id, rating=ratings[team_id], games=games[team_id]))
+
+            db.execute(
+                update(BattleResult)
+                .where(BattleResult.id.in_([r.id for r in batch]))
+                .values(rated=True)
+            )
+            db.commit()
+            processed += len(batch)
+
+        return processed
+    except SQLAlchemyError as e:
+        db.rollback()
+        raise Exception(f"Database error: {str(e)}")
+    except Exception as e:
+        db.rollback()
+        raise e
+    finally:
+        db.close()
+
+def get_leaderboard(limit: int = 10, offset: int = 0) -> list:
+    """Get teams ordered by rating, highest first."""
+    db = SessionLocal()
+    try:
+        rows = (
+            db.query(Team.name, TeamRating.rating, TeamRating.games)
+            .join(Team, Team.id == TeamRating.team_id)
+            .order_by(TeamRating.rating.desc(), TeamRating.team_id)
+            .offset(offset)
+            .limit(limit)
+            .all()
+        )
+        return [
+            {'team': name, 'rating': rating, 'games': games}
+            for name, rating, games in rows
+        ]
+    except SQLAlchemyError as e:
+        raise Exception(f"Database error: {str(e)}")
+    finally:
+        db.close()
@@ -0,0 +1,36 @@
+from typing import Dict
+
+class EloLadder:
+    def __init__(self, k_factor: float = 32.0, initial_rating: float = 1500.0):
+        self.k_factor = k_factor
+        self.initial_rating = initial_rating
+
+    def expected_score(self, rating: float, opponent_rating: float) -> float:
+        """Get the expected score of a team against an opponent."""
+        return 1.0 / (1.0 + 10 ** ((opponent_rating - rating) / 400.0))
+
+    def apply_result(self, ratings: Dict[int, float], player_team_id: int,
+                     opponent_team_id: int, winner: str) -> None:
+        """Update ratings in place from a single battle outcome.
+
+        `winner` is "player" or "opponent", as returned by
+        `BattleSimulator.is_battle_over` once the battle has finished.
+        """
+        if player_team_id == opponent_team_id:
+            raise ValueError("A team cannot battle itself")
+
+        player_rating = ratings.get(player_team_id, self.initial_rating)
+        opponent_rating = ratings.get(opponent_team_id, self.initial_rating)
+
+        if winner == "player":
+            score = 1.0
+        elif winner == "opponent":
+            score = 0.0
+        else:
+            raise ValueError(f"Invalid winner {winner!r}, expected 'player' or 'opponent'")
+
+        expected = self.expected_score(player_rating, opponent_rating)
+        delta = self.k_factor * (score - expected)
+
+        ratings[player_team_id] = player_rating + delta
+        ratings[opponent_team_id] = opponent_rating - delta
@@ -1,4 +1,4 @@
-import typing import Dict, List, Set, Tuple
+from typing import Dict, List, Set, Tuple
 
 class TeamAnalyzer:
     def __init__(self):
@@ -0,0 +1,18 @@
+import os
+import tempfile
+
+import pytest
+
+# database.py creates its engine at import time, so point it at a throwaway
+# sqlite file before any test module imports it.
+_db_file = os.path.join(tempfile.mkdtemp(), "test.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_file}"
+
+
+@pytest.fixture
+def db():
+    import database
+
+    database.Base.metadata.drop_all(bind=database.engine)
+    database.Base.metadata.create_all(bind=database.engine)
+    return database
@@ -0,0 +1,141 @@
+import pytest
+
+from ladder import EloLadder
+
+
+@pytest.fixture
+def teams(db):
+    for name in ("Alpha", "Beta", "Gamma"):
+        db.save_team(name, ["Pikachu"])
+    return db
+
+
+def test_expected_score_is_symmetric():
+    ladder = EloLadder()
+    assert ladder.expected_score(1500, 1500) == pytest.approx(0.5)
+    assert ladder.expected_score(1600, 1400) + ladder.expected_score(1400, 1600) == pytest.approx(1.0)
+
+
+def test_apply_result_moves_ratings_by_k_over_two_for_equal_teams():
+    ratings = {}
+    EloLadder(k_factor=32).apply_result(ratings, 1, 2, "player")
+    assert ratings == {1: pytest.approx(1516.0), 2: pytest.approx(1484.0)}
+
+
+@pytest.mark.parametrize("winner", [None, "draw", "Player"])
+def test_apply_result_rejects_invalid_winner(winner):
+    with pytest.raises(ValueError):
+        EloLadder().apply_result({}, 1, 2, winner)
+
+
+def test_apply_result_rejects_self_match():
+    with pytest.raises(ValueError):
+        EloLadder().apply_result({}, 1, 1, "player")
+
+
+def test_results_are_applied_once(teams):
+    teams.save_battle_results([
+        {"player_team": "Alpha", "opponent_team": "Beta", "winner": "player"},
+        {"player_team": "Gamma", "opponent_team": "Alpha", "winner": "opponent"},
+    ])
+    assert teams.update_ratings() == 2
+    assert teams.update_ratings() == 0
+
+    board = {row["team"]: row for row in teams.get_leaderboard()}
+    assert board["Alpha"]["games"] == 2
+    assert board["Beta"]["games"] == 1
+    assert board["Gamma"]["games"] == 1
+
+
+def test_batches_smaller_than_new_results_match_single_pass(teams):
+    results = [
+        {"player_team": "Alpha", "opponent_team": "Beta", "winner": "player"},
+        {"player_team": "Beta", "opponent_team": "Gamma", "winner": "player"},
+        {"player_team": "Gamma", "opponent_team": "Alpha", "winner": "player"},
+        {"player_team": "Alpha", "opponent_team": "Gamma", "winner": "opponent"},
+        {"player_team": "Beta", "opponent_team": "Alpha", "winner": "opponent"},
+    ]
+    teams.save_battle_results(results)
+    assert teams.update_ratings(batch_size=2) == len(results)
+
+    expected = {}
+    ids = {"Alpha": 1, "Beta": 2, "Gamma": 3}
+    ladder = EloLadder()
+    for r in results:
+        ladder.apply_result(expected, ids[r["player_team"]], ids[r["opponent_team"]], r["winner"])
+
+    board = {row["team"]: row["rating"] for row in teams.get_leaderboard()}
+    for name, team_id in ids.items():
+        assert board[name] == pytest.approx(expected[team_id])
+
+
+def test_new_results_are_applied_incrementally(teams):
+    teams.save_battle_result("Alpha", "Beta", "player")
+    assert teams.update_ratings() == 1
+    teams.save_battle_result("Beta", "Gamma", "player")
+    assert teams.update_ratings() == 1
+
+    board = {row["team"]: row["games"] for row in teams.get_leaderboard()}
+    assert board == {"Alpha": 1, "Beta": 2, "Gamma": 1}
+
+
+def test_result_committed_late_with_lower_id_is_rated(teams):
+    # Simulates a transaction that took a lower id but committed after a
+    # higher id had already been rated
+    session = teams.SessionLocal()
+    try:
+        session.add(teams.BattleResult(id=10, player_team_id=1, opponent_team_id=2, winner="player"))
+        session.commit()
+        assert teams.update_ratings() == 1
+
+        session.add(teams.BattleResult(id=5, player_team_id=2, opponent_team_id=3, winner="player"))
+        session.commit()
+    finally:
+        session.close()
+
+    assert teams.update_ratings() == 1
+    assert teams.update_ratings() == 0
+    board = {row["team"]: row["games"] for row in teams.get_leaderboard()}
+    assert board == {"Alpha": 1, "Beta": 2, "Gamma": 1}
+
+
+def test_unknown_team_is_rejected(teams):
+    with pytest.raises(ValueError, match="Unknown team"):
+        teams.save_battle_result("Alpha", "Nobody", "player")
+    assert teams.update_ratings() == 0
+
+
+@pytest.mark.parametrize("winner", [None, "draw", "Player"])
+def test_invalid_winner_is_rejected(teams, winner):
+    with pytest.raises(ValueError, match="Invalid winner"):
+        teams.save_battle_result("Alpha", "Beta", winner)
+    assert teams.update_ratings() == 0
+
+
+def test_self_match_is_rejected(teams):
+    with pytest.raises(ValueError, match="cannot battle itself"):
+        teams.save_battle_result("Alpha", "Alpha", "player")
+    assert teams.update_ratings() == 0
+
+
+def test_bulk_insert_is_all_or_nothing(teams):
+    with pytest.raises(ValueError):
+        teams.save_battle_results([
+            {"player_team": "Alpha", "opponent_team": "Beta", "winner": "player"},
+            {"player_team": "Alpha", "opponent_team": "Beta", "winner": None},
+        ])
+    assert teams.update_ratings() == 0
+
+
+def test_leaderboard_is_ordered_by_rating(teams):
+    teams.save_battle_results([
+        {"player_team": "Alpha", "opponent_team": "Beta", "winner": "player"},
+        {"player_team": "Alpha", "opponent_team": "Gamma", "winner": "player"},
+        {"player_team": "Beta", "opponent_team": "Gamma", "winner": "player"},
+    ])
+    teams.update_ratings()
+
+    board = teams.get_leaderboard()
+    assert [row["team"] for row in board] == ["Alpha", "Beta", "Gamma"]
+    assert [row["rating"] for row in board] == sorted((row["rating"] for row in board), reverse=True)
+    assert [row["team"] for row in teams.get_leaderboard(limit=1, offset=1)] == ["Beta"]
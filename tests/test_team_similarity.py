@@ -0,0 +1,157 @@
+import numpy as np
+import pytest
+
+from team_similarity import TeamSimilarityIndex
+
+TYPES = {
+    "Pikachu": ["electric"],
+    "Charizard": ["fire", "flying"],
+    "Squirtle": ["water"],
+    "Gengar": ["ghost", "poison"],
+}
+
+THUNDERBOLT = {"name": "Thunderbolt", "type": "electric", "power": 90, "accuracy": 100}
+
+
+def electric_moves(vector, index):
+    n_types = len(index.types)
+    return vector[2 * n_types + index.types.index("electric")]
+
+
+def test_duplicate_species_moves_count_once():
+    index = TeamSimilarityIndex(TYPES.get)
+    vector = index.encode_team(["Pikachu", "Pikachu"], {"Pikachu": [THUNDERBOLT]})
+    assert electric_moves(vector, index) == 1
+
+
+def test_duplicate_species_moves_count_once_from_database(db):
+    db.save_team("Double", ["Pikachu", "Pikachu"], {"Pikachu": [THUNDERBOLT]})
+    team = db.get_all_team_details()["Double"]
+    index = TeamSimilarityIndex(TYPES.get)
+    vector = index.encode_team(team["pokemon"], team["moves"])
+    assert electric_moves(vector, index) == 1
+
+
+def test_save_team_failing_lookup_leaves_database_unchanged(db):
+    def lookup(name):
+        raise Exception(f"Failed to fetch data for {name}")
+
+    index = TeamSimilarityIndex(lookup)
+    with pytest.raises(Exception, match="Failed to fetch"):
+        index.save_team("Broken", ["Pikachu"])
+    assert db.get_all_teams() == []
+    assert len(index) == 0
+
+
+def test_saved_teams_are_queryable(db):
+    index = TeamSimilarityIndex.from_database(TYPES.get)
+    index.save_team("Sparks", ["Pikachu", "Squirtle"], {"Pikachu": [THUNDERBOLT]})
+    index.save_team("Spooky", ["Gengar", "Charizard"])
+    index.save_team("Volt", ["Pikachu"], {"Pikachu": [THUNDERBOLT]})
+
+    for metric in ("cosine", "l1"):
+        names = [name for name, _ in index.most_similar("Sparks", metric=metric)]
+        assert names == ["Volt", "Spooky"]
+
+    rebuilt = TeamSimilarityIndex.from_database(TYPES.get)
+    assert rebuilt.most_similar("Sparks") == index.most_similar("Sparks")
+
+
+def test_moves_of_species_not_on_team_are_ignored():
+    index = TeamSimilarityIndex(TYPES.get)
+    vector = index.encode_team(["Squirtle"], {"Pikachu": [THUNDERBOLT]})
+    assert electric_moves(vector, index) == 0
+
+
+def test_encode_team_sections():
+    index = TeamSimilarityIndex(TYPES.get)
+    n_types = len(index.types)
+    pokemon_list = ["Charizard", "Gengar"]
+    moves_dict = {
+        "Charizard": [{"name": "Flamethrower", "type": "fire"}, {"name": "Air Slash", "type": "flying"}],
+        "Gengar": [{"name": "Shadow Ball", "type": "ghost"}, {"name": "Sludge Bomb", "type": "poison"},
+                   {"name": "Hex", "type": "ghost"}],
+    }
+    vector = index.encode_team(pokemon_list, moves_dict)
+
+    assert len(vector) == index.dimension == 3 * n_types
+
+    type_counts = dict(zip(index.types, vector[:n_types]))
+    assert {t: c for t, c in type_counts.items() if c} == {"fire": 1, "flying": 1, "ghost": 1, "poison": 1}
+
+    weaknesses = index.analyzer.analyze_team_weaknesses([TYPES[name] for name in pokemon_list])
+    assert list(vector[n_types:2 * n_types]) == [weaknesses[t] for t in index.types]
+
+    move_counts = dict(zip(index.types, vector[2 * n_types:]))
+    assert {t: c for t, c in move_counts.items() if c} == {"fire": 1, "flying": 1, "ghost": 2, "poison": 1}
+
+
+def build_index(**kwargs):
+    index = TeamSimilarityIndex(TYPES.get, **kwargs)
+    index.add_team("Sparks", ["Pikachu", "Squirtle"], {"Pikachu": [THUNDERBOLT]})
+    index.add_team("Spooky", ["Gengar", "Charizard"])
+    index.add_team("Volt", ["Pikachu"], {"Pikachu": [THUNDERBOLT]})
+    return index
+
+
+def test_query_with_unindexed_team_and_exclude():
+    index = build_index()
+    assert "Zap" not in index
+
+    results = index.query(["Pikachu"], {"Pikachu": [THUNDERBOLT]}, k=2)
+    assert results[0] == ("Volt", pytest.approx(1.0))
+    assert results[1][0] == "Sparks"
+
+    results = index.query(["Pikachu"], {"Pikachu": [THUNDERBOLT]}, k=2, metric="l1", exclude="Volt")
+    assert [name for name, _ in results] == ["Sparks", "Spooky"]
+
+
+def test_k_larger_than_index_returns_every_team():
+    index = build_index()
+    assert sorted(name for name, _ in index.query(["Gengar"], k=10)) == ["Sparks", "Spooky", "Volt"]
+    assert len(index.most_similar("Volt", k=10)) == 2
+
+
+def test_empty_results():
+    assert TeamSimilarityIndex(TYPES.get).query(["Pikachu"]) == []
+    index = build_index()
+    assert index.query(["Pikachu"], k=0) == []
+    assert index.query(["Pikachu"], k=-1) == []
+
+
+def test_unknown_metric_is_rejected():
+    with pytest.raises(ValueError, match="Unknown metric"):
+        build_index().query(["Pikachu"], metric="euclidean")
+
+
+def test_duplicate_team_is_rejected():
+    index = build_index()
+    with pytest.raises(ValueError, match="already indexed"):
+        index.add_team("Volt", ["Pikachu"])
+
+
+def test_grow_keeps_existing_rows():
+    teams = [
+        ("Sparks", ["Pikachu", "Squirtle"], {"Pikachu": [THUNDERBOLT]}),
+        ("Spooky", ["Gengar", "Charizard"], None),
+        ("Volt", ["Pikachu"], {"Pikachu": [THUNDERBOLT]}),
+        ("Splash", ["Squirtle"], None),
+        ("Blaze", ["Charizard"], None),
+    ]
+    index = TeamSimilarityIndex(TYPES.get, initial_capacity=1)
+    for name, pokemon_list, moves_dict in teams:
+        index.add_team(name, pokemon_list, moves_dict)
+
+    assert len(index) == len(teams)
+    reference = TeamSimilarityIndex(TYPES.get)
+    for name, pokemon_list, moves_dict in teams:
+        position = index._positions[name]
+        assert np.array_equal(index._vectors[position], reference.encode_team(pokemon_list, moves_dict))
+
+
+def test_l1_scores_match_across_chunks(monkeypatch):
+    import team_similarity
+
+    expected = build_index().query(["Gengar"], k=3, metric="l1")
+    monkeypatch.setattr(team_similarity, "L1_CHUNK_SIZE", 2)
+    assert build_index().query(["Gengar"], k=3, metric="l1") == expected